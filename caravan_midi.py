@@ -7,23 +7,53 @@ from __future__ import annotations
 import argparse
 import socket
 import time
-from typing import Tuple
+from typing import List, Tuple
 
+import numpy as np
 
-def make_note_on(channel: int, note: int, velocity: int) -> bytes:
-    status = 0x90 | (channel & 0x0F)
-    return bytes([status, note & 0x7F, velocity & 0x7F])
 
+# MIDI channel-voice encoding used for every step payload
+NOTE_ON = 0x90
+NOTE_OFF = 0x80
+NOTE_OFF_VELOCITY = 64
 
-def make_note_off(channel: int, note: int, velocity: int = 64) -> bytes:
-    status = 0x80 | (channel & 0x0F)
-    return bytes([status, note & 0x7F, velocity & 0x7F])
 
+def build_step_payloads(
+    pattern: List[List[Tuple[int, int]]], channel: int = 0
+) -> List[Tuple[bytes, bytes]]:
+    """Serialize each step of a pattern into (note_on, note_off) datagram payloads.
 
-def play_caravan_pattern(sock, host: str, port: int, tempo_bpm: int = 120) -> None:
+    All events of a step are concatenated into one payload: MIDI messages are
+    self-delimiting, so the receiver parses them back out of one packet.
+    """
+    # Flatten to struct-of-arrays (one note and one velocity array for the whole
+    # pattern) so every message is serialized in a single vectorized pass
+    counts = np.fromiter((len(step) for step in pattern), dtype=np.intp, count=len(pattern))
+    notes = np.fromiter((note for step in pattern for note, _ in step), dtype=np.uint8) & 0x7F
+    vels = np.fromiter((vel for step in pattern for _, vel in step), dtype=np.uint8) & 0x7F
+    
+    on_stream = np.stack(
+        [np.full_like(notes, NOTE_ON | (channel & 0x0F)), notes, vels], axis=-1
+    ).tobytes()
+    off_stream = np.stack(
+        [np.full_like(notes, NOTE_OFF | (channel & 0x0F)), notes,
+         np.full_like(notes, NOTE_OFF_VELOCITY)], axis=-1
+    ).tobytes()
+    
+    # Slice the streams back into per-step payloads (3 bytes per message)
+    ends = (np.cumsum(counts) * 3).tolist()
+    starts = [0] + ends[:-1]
+    return [(on_stream[a:b], off_stream[a:b]) for a, b in zip(starts, ends)]
+
+
+def play_caravan_pattern(
+    sock, host: str, port: int, tempo_bpm: int = 120, verbose: bool = False
+) -> None:
     """Play the classic Caravan drum pattern.
     
     The pattern is in 4/4 time with a distinctive Latin/swing feel.
+    Per-bar status lines are only printed when `verbose` is set, since
+    console I/O in the pacing loop delays the next downbeat.
     """
     # Calculate note durations based on tempo
     beat = 60.0 / tempo_bpm  # Quarter note duration
@@ -82,6 +112,13 @@ def play_caravan_pattern(sock, host: str, port: int, tempo_bpm: int = 120) -> No
         [],
     ]
     
+    # The patterns are fixed, so serialize them once up front
+    bar1_payloads = build_step_payloads(pattern_bar1)
+    bar2_payloads = build_step_payloads(pattern_bar2)
+    fill_payloads = build_step_payloads(fill_pattern)
+    # Connect once so each send skips the per-call address lookup
+    sock.connect((host, port))
+    
     bar_count = 0
     
     try:
@@ -89,33 +126,54 @@ def play_caravan_pattern(sock, host: str, port: int, tempo_bpm: int = 120) -> No
         print(f"Sending to {host}:{port}")
         print("Press Ctrl+C to stop\n")
         
+        # Bind hot-loop callables to locals
+        send = sock.send
+        sleep = time.sleep
+        monotonic = time.monotonic
+        
+        # Steps are scheduled against absolute deadlines so sleep overshoot
+        # doesn't accumulate into tempo drift
+        deadline = monotonic()
+        
         while True:
             bar_count += 1
             
             # Every 8 bars, play a fill
             if bar_count % 8 == 0:
-                print(f"  [Bar {bar_count}] 🔥 FILL!")
-                for step in fill_pattern:
-                    for note, vel in step:
-                        sock.sendto(make_note_on(0, note, vel), (host, port))
-                    time.sleep(sixteenth)
-                    for note, vel in step:
-                        sock.sendto(make_note_off(0, note), (host, port))
-            else:
-                # Alternate between bar 1 and bar 2 patterns
-                if bar_count % 2 == 1:
-                    pattern = pattern_bar1
+                payloads, step_len = fill_payloads, sixteenth
+                if verbose:
+                    print(f"  [Bar {bar_count}] 🔥 FILL!")
+            # Alternate between bar 1 and bar 2 patterns
+            elif bar_count % 2 == 1:
+                payloads, step_len = bar1_payloads, eighth
+                if verbose:
                     print(f"  [Bar {bar_count}] Kick-Snare groove (hi-hat)")
-                else:
-                    pattern = pattern_bar2
+            else:
+                payloads, step_len = bar2_payloads, eighth
+                if verbose:
                     print(f"  [Bar {bar_count}] Kick-Snare groove (ride)")
-                
-                for step in pattern:
-                    for note, vel in step:
-                        sock.sendto(make_note_on(0, note, vel), (host, port))
-                    time.sleep(eighth)
-                    for note, vel in step:
-                        sock.sendto(make_note_off(0, note), (host, port))
+            
+            for note_ons, note_offs in payloads:
+                if note_ons:
+                    try:
+                        send(note_ons)
+                    except ConnectionRefusedError:
+                        # Connected UDP reports ICMP port-unreachable from an earlier
+                        # send; keep playing until the receiver comes up
+                        pass
+                deadline += step_len
+                sleep_for = deadline - monotonic()
+                if sleep_for > 0:
+                    sleep(sleep_for)
+                elif sleep_for < -step_len:
+                    # Fell more than a step behind (e.g. process stalled): resync
+                    # instead of bursting out the missed steps
+                    deadline = monotonic()
+                if note_offs:
+                    try:
+                        send(note_offs)
+                    except ConnectionRefusedError:
+                        pass
     
     except KeyboardInterrupt:
         print("\n\n🎵 Stopped playing Caravan")
@@ -130,10 +188,13 @@ def main(argv: Tuple[str, ...] | None = None) -> None:
     parser.add_argument(
         "--tempo", type=int, default=180, help="Tempo in BPM (default: 180)"
     )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="Print a status line for every bar"
+    )
     args = parser.parse_args(argv)
     
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    play_caravan_pattern(sock, args.host, args.port, args.tempo)
+    play_caravan_pattern(sock, args.host, args.port, args.tempo, args.verbose)
 
 
 if __name__ == "__main__":
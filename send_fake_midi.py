@@ -20,8 +20,10 @@ def make_note_off(channel: int, note: int, velocity: int = 64) -> bytes:
     return bytes([status, note & 0x7F, velocity & 0x7F])
 
 
-def run(host: str, port: int, interval: float = 0.5) -> None:
+def run(host: str, port: int, interval: float = 0.5, verbose: bool = False) -> None:
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    # Connect once so each send skips the per-call address lookup
+    sock.connect((host, port))
     # General MIDI drum notes - play different drums in sequence
     drum_pattern = [
         (36, 100, "Kick"),
@@ -40,13 +42,25 @@ def run(host: str, port: int, interval: float = 0.5) -> None:
     try:
         print(f"Sending drum MIDI notes to {host}:{port} (Ctrl+C to stop)")
         print("Pattern: Kick → Snare → Hi-hats → Crash → Toms → Ride\n")
+        # Bind hot-loop callables to locals
+        send = sock.send
+        sleep = time.sleep
         while True:
             for note, vel, name in drum_pattern:
-                print(f"  Playing: {name} (note {note}, vel {vel})")
-                sock.sendto(make_note_on(0, note, vel), (host, port))
-                time.sleep(interval)
-                sock.sendto(make_note_off(0, note, 64), (host, port))
-                time.sleep(0.05)
+                if verbose:
+                    print(f"  Playing: {name} (note {note}, vel {vel})")
+                try:
+                    send(make_note_on(0, note, vel))
+                except ConnectionRefusedError:
+                    # Connected UDP reports ICMP port-unreachable from an earlier
+                    # send; keep going until the receiver comes up
+                    pass
+                sleep(interval)
+                try:
+                    send(make_note_off(0, note, 64))
+                except ConnectionRefusedError:
+                    pass
+                sleep(0.05)
     except KeyboardInterrupt:
         print("\nStopped")
 
@@ -56,8 +70,9 @@ def main(argv: Tuple[str, ...] | None = None) -> None:
     parser.add_argument("--host", default="127.0.0.1")
     parser.add_argument("--port", type=int, default=6000)
     parser.add_argument("--interval", type=float, default=0.25)
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print every note sent")
     args = parser.parse_args(argv)
-    run(args.host, args.port, args.interval)
+    run(args.host, args.port, args.interval, args.verbose)
 
 
 if __name__ == "__main__":
@@ -1,24 +1,53 @@
-from typing import Dict
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple, Union
+import math
 import numpy as np
-import pygame.mixer
+import sounddevice as sd
 import os
 
+# Sample synthesis runs entirely in float32: it halves memory traffic versus
+# float64 and is far beyond the precision of the 16-bit output.
+DTYPE = np.float32
+
+
+class _Voice:
+    """One playing sample: read position, velocity gain and release state."""
+
+    __slots__ = ("sample", "pos", "gain", "note", "fade_left")
+
+    def __init__(self, sample: np.ndarray, gain: float, note: int) -> None:
+        self.sample = sample
+        self.pos = 0
+        self.gain = gain
+        self.note = note
+        self.fade_left = -1  # frames of fade-out remaining; -1 while not released
+
 
 class AudioEngine:
     """Audio engine that plays drum samples for MIDI notes.
 
-    - Generates synthetic drum samples using numpy and pygame.mixer
+    - Generates synthetic drum samples using numpy
     - Maps MIDI notes to different drum sounds (kick, snare, hihat, toms, etc.)
-    - Keeps track of active Channels to stop on note_off.
+    - Mixes playing voices itself in a small-block sounddevice (PortAudio) callback;
+      note_on/note_off only queue work for it, so they are safe to call from any thread.
+    - Fades out sustained cymbal voices on note_off.
     """
 
-    def __init__(self, sample_rate: int = 44100) -> None:
+    DRUM_NAMES = (
+        "kick", "snare", "hihat_closed", "hihat_open",
+        "tom_low", "tom_mid", "tom_high", "crash", "ride",
+    )
+    # Drums that ring long enough to be faded out on note_off; the rest decay
+    # naturally within tens of ms and are left alone
+    SUSTAINED = frozenset({"crash", "ride", "hihat_open"})
+    MAX_VOICES = 32
+    FADE_MS = 100
+
+    def __init__(self, sample_rate: int = 44100, blocksize: int = 128) -> None:
         self.sample_rate = sample_rate
-        pygame.mixer.init(frequency=sample_rate, size=-16, channels=2, buffer=512)
-        self._active: Dict[int, pygame.mixer.Channel] = {}
         
         # Pre-generate drum samples for better performance
-        self._drum_samples: Dict[str, pygame.mixer.Sound] = {}
+        self._drum_samples: Dict[str, np.ndarray] = {}
         self._generate_drum_samples()
         
         # Map MIDI notes to drum sounds (General MIDI drum map)
@@ -41,221 +70,360 @@ class AudioEngine:
             43: "tom_low",   # High Floor Tom
             45: "tom_mid",   # Low Tom
         }
+        
+        # Note-indexed sound table for the note_on hot path; unmapped notes play the snare
+        self._default_sound = self._drum_samples["snare"]
+        self._note_sounds = [self._default_sound] * 128
+        self._note_sustained = [False] * 128
+        for note, drum_type in self._note_map.items():
+            self._note_sounds[note] = self._drum_samples[drum_type]
+            self._note_sustained[note] = drum_type in self.SUSTAINED
+        
+        # Mixer state. note_on/note_off push ("on", voice) / ("off", note) events onto
+        # one deque (thread-safe appends), which the audio callback drains in arrival
+        # order; only the callback touches _voices and the scratch buffers.
+        self._events: Deque[Tuple[str, Union[_Voice, int]]] = deque()
+        self._voices: List[_Voice] = []
+        self._fade_frames = sample_rate * self.FADE_MS // 1000
+        self._fade_ramp = np.linspace(1, 0, self._fade_frames, endpoint=False, dtype=DTYPE)
+        self._mix_buf = np.zeros(blocksize, dtype=DTYPE)
+        self._tmp_out = np.zeros(blocksize, dtype=DTYPE)
+        
+        self._stream = sd.OutputStream(
+            samplerate=sample_rate,
+            blocksize=blocksize,
+            channels=2,
+            dtype="int16",
+            latency="low",
+            callback=self._audio_cb,
+        )
+        self._stream.start()
+
+    # Synthesized samples are cached on disk as int16 mono and loaded into RAM on
+    # later starts. They are not memory-mapped: a first-touch page fault (possibly
+    # a disk read) inside the real-time audio callback would risk an underrun.
+    # Bump _CACHE_VERSION whenever the synthesis output or cache format changes.
+    _CACHE_DIR = os.path.expanduser("~/.cache/esp32_airdrums")
+    _CACHE_VERSION = 3
 
     def _generate_drum_samples(self) -> None:
+        """Load drum samples from the disk cache, synthesizing them on a cold start."""
+        cache_dir = os.path.join(self._CACHE_DIR, f"v{self._CACHE_VERSION}_{self.sample_rate}")
+        arrays = self._load_cached_samples(cache_dir)
+        if arrays is None:
+            arrays = self._synthesize_drum_samples()
+            self._save_cached_samples(cache_dir, arrays)
+        self._drum_samples.update(arrays)
+
+    def _load_cached_samples(self, cache_dir: str) -> Optional[Dict[str, np.ndarray]]:
+        """Load every cached sample, or return None if any is missing or unreadable."""
+        arrays: Dict[str, np.ndarray] = {}
+        for name in self.DRUM_NAMES:
+            try:
+                sample = np.load(os.path.join(cache_dir, f"{name}.npy"))
+            except (OSError, ValueError, EOFError):
+                return None
+            # Anything but int16 mono (a stale or foreign file) must not reach the mixer
+            if sample.ndim != 1 or sample.dtype != np.int16:
+                return None
+            arrays[name] = sample
+        return arrays
+
+    def _save_cached_samples(self, cache_dir: str, arrays: Dict[str, np.ndarray]) -> None:
+        """Write samples to the cache. Best effort: failures only cost a re-synthesis next start."""
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            for name, mono in arrays.items():
+                path = os.path.join(cache_dir, f"{name}.npy")
+                with open(path + ".tmp", "wb") as f:
+                    np.save(f, mono)
+                os.replace(path + ".tmp", path)
+        except OSError:
+            pass
+
+    def _synthesize_drum_samples(self) -> Dict[str, np.ndarray]:
         """Generate synthetic drum samples using audio synthesis."""
+        # Fixed seed so the noise-based drums are reproducible across runs
+        self._rng = np.random.default_rng(0)
+        
+        # Shared float32 time base and scratch buffers, sized for the longest
+        # sample (crash). Each drum slices these instead of allocating its own.
+        max_samples = int(self.sample_rate * 1.5)
+        self._t_cache = np.arange(max_samples, dtype=DTYPE) / DTYPE(self.sample_rate)
+        self._env_buf = np.empty(max_samples, dtype=DTYPE)
+        self._wave_buf = np.empty(max_samples, dtype=DTYPE)
+        self._tmp_buf = np.empty(max_samples, dtype=DTYPE)
+        self._noise_buf = np.empty(max_samples, dtype=DTYPE)
+        
+        arrays: Dict[str, np.ndarray] = {}
         
         # Kick drum - deep bass thump with pitch envelope
-        kick = self._create_kick()
-        self._drum_samples["kick"] = kick
+        arrays["kick"] = self._create_kick()
         
         # Snare drum - noise burst with tone
-        snare = self._create_snare()
-        self._drum_samples["snare"] = snare
+        arrays["snare"] = self._create_snare()
         
         # Closed hi-hat - short metallic noise
-        hihat_closed = self._create_hihat_closed()
-        self._drum_samples["hihat_closed"] = hihat_closed
+        arrays["hihat_closed"] = self._create_hihat_closed()
         
         # Open hi-hat - longer metallic noise
-        hihat_open = self._create_hihat_open()
-        self._drum_samples["hihat_open"] = hihat_open
+        arrays["hihat_open"] = self._create_hihat_open()
         
         # Toms - tuned drums
-        self._drum_samples["tom_low"] = self._create_tom(120)
-        self._drum_samples["tom_mid"] = self._create_tom(180)
-        self._drum_samples["tom_high"] = self._create_tom(250)
+        arrays["tom_low"] = self._create_tom(120)
+        arrays["tom_mid"] = self._create_tom(180)
+        arrays["tom_high"] = self._create_tom(250)
         
         # Crash cymbal - long metallic wash
-        crash = self._create_crash()
-        self._drum_samples["crash"] = crash
+        arrays["crash"] = self._create_crash()
         
         # Ride cymbal - sustained metallic ping
-        ride = self._create_ride()
-        self._drum_samples["ride"] = ride
+        arrays["ride"] = self._create_ride()
+        
+        # Scratch state is only needed while synthesizing; drop it so a cold
+        # start doesn't keep ~1.3 MB alive that a warm (cached) start never has
+        del self._rng, self._t_cache, self._env_buf, self._wave_buf, self._tmp_buf, self._noise_buf
+        return arrays
 
-    def _create_kick(self) -> pygame.mixer.Sound:
-        """Create a synthesized kick drum sound."""
-        duration = 0.5
+    def _buffers(self, duration: float):
+        """Return (t, env, wave) views of the shared buffers for a sample of given duration."""
         samples = int(self.sample_rate * duration)
-        t = np.linspace(0, duration, samples, False)
+        return self._t_cache[:samples], self._env_buf[:samples], self._wave_buf[:samples]
+
+    def _noise(self, samples: int) -> np.ndarray:
+        """Fill the shared noise buffer with `samples` standard-normal float32 values."""
+        noise = self._noise_buf[:samples]
+        self._rng.standard_normal(out=noise, dtype=DTYPE)
+        return noise
+
+    @staticmethod
+    def _decay(t: np.ndarray, rate: float, out: np.ndarray) -> np.ndarray:
+        """exp(-rate * t) written into `out` without temporaries."""
+        np.multiply(t, -rate, out=out)
+        return np.exp(out, out=out)
+
+    @staticmethod
+    def _sine(t: np.ndarray, freq: float, out: np.ndarray) -> np.ndarray:
+        """sin(2pi * freq * t) written into `out` without temporaries."""
+        np.multiply(t, 2 * np.pi * freq, out=out)
+        return np.sin(out, out=out)
+
+    def _to_pcm(self, wave: np.ndarray, level: float) -> np.ndarray:
+        """Normalize a mono float wave in place to `level` and return it as int16 mono."""
+        # Peak via max/min avoids allocating an np.abs(wave) temporary
+        peak = max(wave.max(), -wave.min())
+        wave *= DTYPE(level * (2 ** 15 - 1) / peak)
+        np.rint(wave, out=wave)
+        return wave.astype(np.int16)
+
+    def _create_kick(self) -> np.ndarray:
+        """Create a synthesized kick drum sound."""
+        t, envelope, wave = self._buffers(0.5)
         
-        # Pitch envelope - starts at 150Hz, drops to 40Hz
+        # Pitch envelope - starts at 150Hz, decays as exp(-8t) until it
+        # reaches the 40Hz floor at t_floor, then holds
         freq_start = 150
         freq_end = 40
-        freq = freq_start * np.exp(-8 * t)
-        freq = np.maximum(freq, freq_end)
-        
-        # Generate tone
-        phase = 2 * np.pi * np.cumsum(freq) / self.sample_rate
-        wave = np.sin(phase)
+        t_floor = DTYPE(math.log(freq_start / freq_end) / 8)
+        
+        # Generate tone - integrate the pitch envelope in closed form:
+        # phase(t) = 2pi * (f0 * (1 - exp(-8 tc)) / 8 + f1 * (t - tc)), tc = min(t, t_floor)
+        np.minimum(t, t_floor, out=wave)
+        self._decay(wave, 8, envelope)
+        np.subtract(t, wave, out=wave)
+        wave *= freq_end
+        envelope *= -freq_start / 8
+        envelope += freq_start / 8
+        wave += envelope
+        wave *= 2 * np.pi
+        np.sin(wave, out=wave)
         
         # Amplitude envelope - quick attack, exponential decay
-        envelope = np.exp(-8 * t)
-        wave = wave * envelope
+        self._decay(t, 8, envelope)
+        wave *= envelope
         
         # Add click at the start for punch
-        click = np.exp(-100 * t) * np.random.randn(samples) * 0.3
-        wave = wave + click
-        
-        # Normalize and convert
-        wave = wave / np.max(np.abs(wave)) * 0.9
-        audio = (wave * (2 ** 15 - 1)).astype(np.int16)
-        stereo = np.column_stack((audio, audio))
-        return pygame.sndarray.make_sound(stereo)
+        self._decay(t, 100, envelope)
+        envelope *= self._noise(len(t))
+        envelope *= 0.3
+        wave += envelope
+        
+        return self._to_pcm(wave, 0.9)
 
-    def _create_snare(self) -> pygame.mixer.Sound:
+    def _create_snare(self) -> np.ndarray:
         """Create a synthesized snare drum sound."""
-        duration = 0.2
-        samples = int(self.sample_rate * duration)
-        t = np.linspace(0, duration, samples, False)
-        
-        # Tone component (around 200Hz)
-        tone = np.sin(2 * np.pi * 200 * t)
-        tone = tone * np.exp(-15 * t)
+        t, envelope, wave = self._buffers(0.2)
         
         # Noise component (snare wires)
-        noise = np.random.randn(samples)
-        noise = noise * np.exp(-12 * t)
-        
-        # Mix tone and noise
-        wave = tone * 0.3 + noise * 0.7
-        
-        # Normalize
-        wave = wave / np.max(np.abs(wave)) * 0.85
-        audio = (wave * (2 ** 15 - 1)).astype(np.int16)
-        stereo = np.column_stack((audio, audio))
-        return pygame.sndarray.make_sound(stereo)
+        self._decay(t, 12, envelope)
+        np.multiply(self._noise(len(t)), envelope, out=wave)
+        wave *= 0.7
+        
+        # Tone component (around 200Hz), mixed in
+        tmp = self._tmp_buf[:len(t)]
+        self._decay(t, 15, envelope)
+        envelope *= self._sine(t, 200, tmp)
+        envelope *= 0.3
+        wave += envelope
+        
+        return self._to_pcm(wave, 0.85)
 
-    def _create_hihat_closed(self) -> pygame.mixer.Sound:
+    def _create_hihat_closed(self) -> np.ndarray:
         """Create a closed hi-hat sound."""
-        duration = 0.05
-        samples = int(self.sample_rate * duration)
-        t = np.linspace(0, duration, samples, False)
+        t, envelope, wave = self._buffers(0.05)
         
         # High-frequency noise (metallic)
-        noise = np.random.randn(samples)
-        
         # High-pass filter effect (emphasize high frequencies)
-        noise = noise * (1 + 5 * np.sin(2 * np.pi * 8000 * t))
+        self._sine(t, 8000, wave)
+        wave *= 5
+        wave += 1
+        wave *= self._noise(len(t))
         
         # Sharp decay
-        envelope = np.exp(-80 * t)
-        wave = noise * envelope
+        self._decay(t, 80, envelope)
+        wave *= envelope
         
-        wave = wave / np.max(np.abs(wave)) * 0.6
-        audio = (wave * (2 ** 15 - 1)).astype(np.int16)
-        stereo = np.column_stack((audio, audio))
-        return pygame.sndarray.make_sound(stereo)
+        return self._to_pcm(wave, 0.6)
 
-    def _create_hihat_open(self) -> pygame.mixer.Sound:
+    def _create_hihat_open(self) -> np.ndarray:
         """Create an open hi-hat sound."""
-        duration = 0.3
-        samples = int(self.sample_rate * duration)
-        t = np.linspace(0, duration, samples, False)
+        t, envelope, wave = self._buffers(0.3)
         
         # High-frequency noise
-        noise = np.random.randn(samples)
-        noise = noise * (1 + 3 * np.sin(2 * np.pi * 7000 * t))
+        self._sine(t, 7000, wave)
+        wave *= 3
+        wave += 1
+        wave *= self._noise(len(t))
         
         # Slower decay than closed
-        envelope = np.exp(-8 * t)
-        wave = noise * envelope
+        self._decay(t, 8, envelope)
+        wave *= envelope
         
-        wave = wave / np.max(np.abs(wave)) * 0.5
-        audio = (wave * (2 ** 15 - 1)).astype(np.int16)
-        stereo = np.column_stack((audio, audio))
-        return pygame.sndarray.make_sound(stereo)
+        return self._to_pcm(wave, 0.5)
 
-    def _create_tom(self, base_freq: float) -> pygame.mixer.Sound:
+    def _create_tom(self, base_freq: float) -> np.ndarray:
         """Create a tom drum sound at specified frequency."""
-        duration = 0.4
-        samples = int(self.sample_rate * duration)
-        t = np.linspace(0, duration, samples, False)
+        t, envelope, wave = self._buffers(0.4)
         
-        # Pitch envelope
-        freq = base_freq * np.exp(-5 * t)
-        phase = 2 * np.pi * np.cumsum(freq) / self.sample_rate
-        wave = np.sin(phase)
+        # Pitch envelope base_freq * exp(-5t), integrated in closed form:
+        # phase(t) = 2pi * base_freq * (1 - exp(-5t)) / 5
+        phase = self._decay(t, 5, self._tmp_buf[:len(t)])
+        phase *= -2 * np.pi * base_freq / 5
+        phase += 2 * np.pi * base_freq / 5
+        np.sin(phase, out=wave)
         
         # Add harmonics for more realistic tone
-        wave += 0.3 * np.sin(2 * phase)
-        wave += 0.1 * np.sin(3 * phase)
+        for harmonic, level in ((2, 0.3), (3, 0.1)):
+            np.multiply(phase, harmonic, out=envelope)
+            np.sin(envelope, out=envelope)
+            envelope *= level
+            wave += envelope
         
         # Amplitude envelope
-        envelope = np.exp(-7 * t)
-        wave = wave * envelope
+        self._decay(t, 7, envelope)
+        wave *= envelope
         
-        wave = wave / np.max(np.abs(wave)) * 0.8
-        audio = (wave * (2 ** 15 - 1)).astype(np.int16)
-        stereo = np.column_stack((audio, audio))
-        return pygame.sndarray.make_sound(stereo)
+        return self._to_pcm(wave, 0.8)
 
-    def _create_crash(self) -> pygame.mixer.Sound:
+    def _create_crash(self) -> np.ndarray:
         """Create a crash cymbal sound."""
-        duration = 1.5
-        samples = int(self.sample_rate * duration)
-        t = np.linspace(0, duration, samples, False)
+        t, envelope, wave = self._buffers(1.5)
         
         # Complex noise with multiple frequency bands
-        noise = np.random.randn(samples)
+        self._rng.standard_normal(out=wave, dtype=DTYPE)
         
         # Add shimmer with modulation
         for freq in [3000, 5000, 8000, 12000]:
-            noise = noise * (1 + 0.3 * np.sin(2 * np.pi * freq * t))
+            self._sine(t, freq, envelope)
+            envelope *= 0.3
+            envelope += 1
+            wave *= envelope
         
         # Long decay
-        envelope = np.exp(-2 * t)
-        wave = noise * envelope
+        self._decay(t, 2, envelope)
+        wave *= envelope
         
-        wave = wave / np.max(np.abs(wave)) * 0.6
-        audio = (wave * (2 ** 15 - 1)).astype(np.int16)
-        stereo = np.column_stack((audio, audio))
-        return pygame.sndarray.make_sound(stereo)
+        return self._to_pcm(wave, 0.6)
 
-    def _create_ride(self) -> pygame.mixer.Sound:
+    def _create_ride(self) -> np.ndarray:
         """Create a ride cymbal sound."""
-        duration = 1.0
-        samples = int(self.sample_rate * duration)
-        t = np.linspace(0, duration, samples, False)
+        t, envelope, wave = self._buffers(1.0)
         
         # Metallic tone with noise
-        tone = np.sin(2 * np.pi * 800 * t) + 0.5 * np.sin(2 * np.pi * 1600 * t)
-        noise = np.random.randn(samples) * 0.3
+        self._sine(t, 1600, wave)
+        wave *= 0.5
+        wave += self._sine(t, 800, envelope)
+        np.multiply(self._noise(len(t)), 0.3, out=envelope)
+        wave += envelope
         
-        wave = tone + noise
-        envelope = np.exp(-3 * t)
-        wave = wave * envelope
+        self._decay(t, 3, envelope)
+        wave *= envelope
         
-        wave = wave / np.max(np.abs(wave)) * 0.65
-        audio = (wave * (2 ** 15 - 1)).astype(np.int16)
-        stereo = np.column_stack((audio, audio))
-        return pygame.sndarray.make_sound(stereo)
+        return self._to_pcm(wave, 0.65)
 
     def note_on(self, note: int, velocity: int) -> None:
         """Play drum sample for the given MIDI note."""
-        # Map note to drum type
-        drum_type = self._note_map.get(note, "snare")  # default to snare for unmapped notes
-        
-        # Get the sample
-        sound = self._drum_samples.get(drum_type)
-        if not sound:
-            return
-        
-        # Adjust volume based on velocity
-        volume = velocity / 127.0
-        sound.set_volume(volume)
-        
-        # Play the sound
-        channel = sound.play()
-        if channel:
-            self._active[note] = channel
+        # Map note to its sample
+        sample = self._note_sounds[note] if 0 <= note < 128 else self._default_sound
+        
+        # Volume follows velocity; the voice starts on the next audio block.
+        # A float32 gain keeps the int16 * gain product in a float32 loop.
+        self._events.append(("on", _Voice(sample, DTYPE(velocity / 127.0), note)))
 
     def note_off(self, note: int) -> None:
-        """Stop playing the drum sound (for cymbals/sustained sounds)."""
-        channel = self._active.pop(note, None)
-        if channel:
-            try:
-                channel.fadeout(100)  # Fade out over 100ms for smooth stop
-            except Exception:
-                pass
+        """Fade out a sustained drum sound (cymbals/open hi-hat); other drums are left to decay."""
+        if 0 <= note < 128 and self._note_sustained[note]:
+            self._events.append(("off", note))
+
+    def close(self) -> None:
+        """Stop the output stream."""
+        self._stream.close()
+
+    def _audio_cb(self, outdata: np.ndarray, frames: int, time_info, status) -> None:
+        """PortAudio callback: sum all active voices into the next output block."""
+        if frames > len(self._mix_buf):
+            self._mix_buf = np.zeros(frames, dtype=DTYPE)
+            self._tmp_out = np.zeros(frames, dtype=DTYPE)
+        mix = self._mix_buf[:frames]
+        tmp = self._tmp_out
+        mix.fill(0)
+        
+        # Apply queued events in arrival order, so a note_off only releases
+        # voices started before it
+        voices = self._voices
+        events = self._events
+        while events:
+            kind, item = events.popleft()
+            if kind == "on":
+                voices.append(item)
+            else:
+                for voice in voices:
+                    if voice.note == item and voice.fade_left < 0:
+                        voice.fade_left = self._fade_frames
+        if len(voices) > self.MAX_VOICES:
+            del voices[:len(voices) - self.MAX_VOICES]  # steal the oldest
+        
+        alive = []
+        for voice in voices:
+            chunk = voice.sample[voice.pos:voice.pos + frames]
+            n = len(chunk)
+            if voice.fade_left >= 0:
+                # Released: apply the linear fade ramp, ending the voice when it runs out
+                n = min(n, voice.fade_left)
+                done = self._fade_frames - voice.fade_left
+                chunk = chunk[:n]
+                np.multiply(chunk, self._fade_ramp[done:done + n], out=tmp[:n])
+                tmp[:n] *= voice.gain
+                voice.fade_left -= n
+            else:
+                np.multiply(chunk, voice.gain, out=tmp[:n])
+            mix[:n] += tmp[:n]
+            voice.pos += n
+            if voice.pos < len(voice.sample) and voice.fade_left != 0:
+                alive.append(voice)
+        self._voices = alive
+        
+        # Samples are int16 PCM, so the mix is already in output units
+        np.clip(mix, -(2 ** 15), 2 ** 15 - 1, out=mix)
+        outdata[:, 0] = mix
+        outdata[:, 1] = mix
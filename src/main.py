@@ -35,6 +35,7 @@ def main(argv: Tuple[str, ...] | None = None) -> None:
         ui.run()
     finally:
         server.stop()
+        engine.close()
 
 
 if __name__ == "__main__":
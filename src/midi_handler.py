@@ -1,9 +1,8 @@
-from typing import Callable, Optional
+from typing import Callable, List, Optional, Union
 
-try:
-    import mido
-except Exception:  # pragma: no cover - fallback when mido isn't installed
-    mido = None  # type: ignore
+# Bytes to consume for each high nibble of the byte at the cursor, indexed by byte >> 4.
+# Stray data bytes (0x0n..0x7n) and system messages (0xFn) are skipped one byte at a time.
+_LENGTH_TABLE = bytes((1, 1, 1, 1, 1, 1, 1, 1, 3, 3, 3, 3, 2, 2, 3, 1))
 
 
 class MidiHandler:
@@ -22,56 +21,46 @@ class MidiHandler:
         self.note_off_cb = note_off_cb
         self.control_change_cb = control_change_cb
 
-    def handle_packet(self, data: bytes) -> None:
+        # Jump table indexed by status byte; None means the message is skipped
+        self._dispatch: List[Optional[Callable[[memoryview, int], None]]] = [None] * 256
+        for ch in range(16):
+            self._dispatch[0x80 | ch] = self._do_note_off
+            self._dispatch[0x90 | ch] = self._do_note_on
+            self._dispatch[0xB0 | ch] = self._do_control_change
+
+    def handle_packet(self, data: Union[bytes, bytearray, memoryview]) -> None:
         """Parse data bytes and invoke callbacks. Expects data to contain one or more MIDI messages.
 
-        Uses mido if available; otherwise a tiny fallback supporting 0x8n, 0x9n, 0xBn messages.
+        Handles note_on (0x9n), note_off (0x8n) and control_change (0xBn); other channel
+        messages are skipped whole, stray data bytes one at a time.
         """
-        if mido:
-            try:
-                for msg in mido.parse_all(data):
-                    self._handle_mido_message(msg)
-                return
-            except Exception:
-                # fall through to fallback parser
-                pass
+        mv = memoryview(data)
+        n = len(mv)
+        dispatch = self._dispatch
 
-        # Fallback quick parser (handles most basic 3-byte messages)
         i = 0
-        while i < len(data):
-            status = data[i]
-            if status >= 0x80 and status <= 0xEF:
-                # Determine message length by high nibble
-                typ = status & 0xF0
-                if typ in (0x80, 0x90, 0xB0):
-                    if i + 2 < len(data):
-                        ch = status & 0x0F
-                        a = data[i + 1]
-                        b = data[i + 2]
-                        if typ == 0x90:
-                            if b > 0:
-                                self.note_on_cb(a, b)
-                            else:
-                                self.note_off_cb(a)
-                        elif typ == 0x80:
-                            self.note_off_cb(a)
-                        elif typ == 0xB0 and self.control_change_cb:
-                            self.control_change_cb(a, b)
-                        i += 3
-                        continue
-                # Unknown/unsupported or running status: skip one byte
-                i += 1
-            else:
-                # Data byte without status — skip
+        while i < n:
+            status = mv[i]
+            length = _LENGTH_TABLE[status >> 4]
+            if i + length > n:
+                # Truncated message: skip the status byte
                 i += 1
+                continue
+            handler = dispatch[status]
+            if handler is not None:
+                handler(mv, i)
+            i += length
+
+    def _do_note_on(self, mv: memoryview, i: int) -> None:
+        velocity = mv[i + 2]
+        if velocity > 0:
+            self.note_on_cb(mv[i + 1], velocity)
+        else:
+            self.note_off_cb(mv[i + 1])
+
+    def _do_note_off(self, mv: memoryview, i: int) -> None:
+        self.note_off_cb(mv[i + 1])
 
-    def _handle_mido_message(self, msg) -> None:  # msg is mido.Message
-        if msg.type == "note_on":
-            if msg.velocity > 0:
-                self.note_on_cb(int(msg.note), int(msg.velocity))
-            else:
-                self.note_off_cb(int(msg.note))
-        elif msg.type == "note_off":
-            self.note_off_cb(int(msg.note))
-        elif msg.type == "control_change" and self.control_change_cb:
-            self.control_change_cb(int(msg.control), int(msg.value))
+    def _do_control_change(self, mv: memoryview, i: int) -> None:
+        if self.control_change_cb:
+            self.control_change_cb(mv[i + 1], mv[i + 2])
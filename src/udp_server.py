@@ -1,20 +1,25 @@
 from typing import Callable
+import os
+import selectors
 import socket
 import threading
 
 
 class UDPServer:
-    """Simple UDP server that calls a callback with (data: bytes, addr).
+    """Simple UDP server that calls a callback with (data: memoryview, addr).
 
-    Runs in its own thread and can be stopped.
+    Runs in its own thread and can be stopped. Packets are received into one
+    reused buffer, so `data` is only valid for the duration of the callback;
+    copy it with bytes(data) if it must be kept.
     """
 
-    def __init__(self, host: str, port: int, on_packet: Callable[[bytes, tuple], None]):
+    def __init__(self, host: str, port: int, on_packet: Callable[[memoryview, tuple], None]):
         self.host = host
         self.port = port
         self.on_packet = on_packet
         self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._tune_socket()
         self._thread: threading.Thread | None = None
         self._running = threading.Event()
 
@@ -24,25 +29,74 @@ class UDPServer:
         self._thread = threading.Thread(target=self._recv_loop, daemon=True)
         self._thread.start()
 
-    def _recv_loop(self) -> None:
-        while self._running.is_set():
+    def _tune_socket(self) -> None:
+        """Best effort: enlarge the receive buffer for bursts and enable busy polling where supported."""
+        options = [(socket.SO_RCVBUF, 1 << 20)]
+        # SO_BUSY_POLL is Linux-only and not exported by every Python build. Its number
+        # differs between architectures, so only use it when socket provides it.
+        busy_poll = getattr(socket, "SO_BUSY_POLL", None)
+        if busy_poll is not None:
+            options.append((busy_poll, 50))  # microseconds
+        for option, value in options:
+            try:
+                self._sock.setsockopt(socket.SOL_SOCKET, option, value)
+            except OSError:
+                pass
+
+    def _tune_thread(self) -> None:
+        """Best effort: pin the calling thread to the last CPU and give it real-time priority.
+
+        Both calls target the calling thread (pid 0) and are Linux-only; SCHED_FIFO
+        usually needs CAP_SYS_NICE, so failures are ignored.
+        """
+        if hasattr(os, "sched_setaffinity"):
             try:
-                data, addr = self._sock.recvfrom(2048)
+                os.sched_setaffinity(0, {max(os.sched_getaffinity(0))})
             except OSError:
-                break
+                pass
+        if hasattr(os, "sched_setscheduler"):
             try:
-                self.on_packet(data, addr)
-            except Exception:
-                # keep server alive even if callback fails
-                import traceback
+                os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(20))
+            except OSError:
+                pass
 
-                traceback.print_exc()
+    def _recv_loop(self) -> None:
+        self._tune_thread()
+        buf = bytearray(2048)
+        view = memoryview(buf)
+        sock = self._sock
+        sock.setblocking(False)
+        with selectors.DefaultSelector() as sel:
+            sel.register(sock, selectors.EVENT_READ)
+            while self._running.is_set():
+                # Wake once per burst (or every 50ms to notice stop()), then drain
+                # every queued datagram before sleeping again
+                try:
+                    if not sel.select(timeout=0.05):
+                        continue
+                except (OSError, ValueError):
+                    break
+                while True:
+                    try:
+                        n, addr = sock.recvfrom_into(buf)
+                    except BlockingIOError:
+                        break
+                    except OSError:
+                        return
+                    try:
+                        self.on_packet(view[:n], addr)
+                    except Exception:
+                        # keep server alive even if callback fails
+                        import traceback
+
+                        traceback.print_exc()
 
     def stop(self) -> None:
         self._running.clear()
+        # The receive loop polls _running, so let it exit before closing the socket under it
+        if self._thread:
+            self._thread.join(timeout=1.0)
         try:
             self._sock.close()
         except Exception:
             pass
-        if self._thread:
-            self._thread.join(timeout=1.0)
@@ -1,7 +1,49 @@
-from typing import Callable, Dict
+from typing import Callable, Dict, List, Optional, Tuple
 import tkinter as tk
 from tkinter import ttk
 import math
+import threading
+import numpy as np
+
+# Drum ids: index drum_ids, drum_animations and the per-drum color tuples
+KICK, SNARE, HIHAT, CRASH, RIDE, TOM_HIGH, TOM_MID, TOM_LOW = range(8)
+NUM_DRUMS = 8
+
+# General MIDI percussion notes shown on the kit
+NOTE_TO_DRUM = {
+    35: KICK, 36: KICK,
+    38: SNARE, 40: SNARE,
+    42: HIHAT, 44: HIHAT, 46: HIHAT,
+    49: CRASH, 52: CRASH,
+    51: RIDE, 53: RIDE,
+    50: TOM_HIGH,
+    48: TOM_MID,
+    41: TOM_LOW, 43: TOM_LOW, 45: TOM_LOW, 47: TOM_LOW,
+}
+
+
+class _AnimState:
+    """Per-hit animation state, advanced one frame at a time by MidiUI._tick."""
+
+    __slots__ = (
+        "step", "drum", "drum_obj", "fx_tag", "ripples", "cx", "cy",
+        "max_radius", "vel_norm", "base_color", "color_table",
+    )
+
+    def __init__(self, drum: int, drum_obj: int, fx_tag: str, ripples: list,
+                 cx: float, cy: float, max_radius: float, vel_norm: float,
+                 base_color: str, color_table: list) -> None:
+        self.step = 0
+        self.drum = drum
+        self.drum_obj = drum_obj
+        self.fx_tag = fx_tag
+        self.ripples = ripples  # [(canvas id, progress offset), ...]
+        self.cx = cx
+        self.cy = cy
+        self.max_radius = max_radius
+        self.vel_norm = vel_norm
+        self.base_color = base_color
+        self.color_table = color_table
 
 
 class MidiUI:
@@ -20,6 +62,37 @@ class MidiUI:
     TEXT_PRIMARY = "#ffffff"
     TEXT_SECONDARY = "#95a5a6"
 
+    # Canvas tag for transient effects (ripples), kept apart from the static kit items
+    FX_TAG = "fx"
+
+    # Hex strings for every gray level, used for fading ripple outlines
+    GRAY_HEX = tuple("#" + bytes((i, i, i)).hex() for i in range(256))
+
+    # Frames per hit animation, and its reciprocal so frames multiply instead of divide
+    ANIM_STEPS = 15
+    _ANIM_STEPS_INV = 1.0 / ANIM_STEPS
+
+    # Concurrent full animations before new hits fall back to a plain flash
+    MAX_ANIMATIONS = 4
+
+    # Kit layout in draw order: (drum, label, color, is_cymbal, x, y, radius).
+    # x and y are (a, b) pairs placing the center at a * width + b * scale (resp.
+    # height); radius is multiplied by scale. Scale is 1.0 at 900x600.
+    _DRUM_LAYOUT = (
+        # Cymbals at the top
+        (CRASH, "CRASH\n49", DRUM_CYMBAL, True, (0, 150), (0, 100), 70),
+        (RIDE, "RIDE\n51", DRUM_CYMBAL, True, (1, -150), (0, 100), 70),
+        (HIHAT, "HI-HAT\n42/46", DRUM_HIHAT, True, (0, 220), (0, 200), 50),
+        # Toms in the middle-top
+        (TOM_HIGH, "TOM H\n50", DRUM_TOM, False, (0.5, -40), (0, 180), 60),
+        (TOM_MID, "TOM M\n48", DRUM_TOM, False, (0.5, 80), (0, 180), 70),
+        (TOM_LOW, "TOM L\n45", DRUM_TOM, False, (1, -220), (0, 250), 80),
+        # Snare center
+        (SNARE, "SNARE\n38", DRUM_SNARE, False, (0.5, 0), (0.5, 0), 90),
+        # Kick drum at bottom center (largest)
+        (KICK, "KICK\n36", DRUM_KICK, False, (0.5, 0), (0.75, 0), 110),
+    )
+
     def __init__(self, on_close: Callable[[], None]):
         self.root = tk.Tk()
         self.root.title("🥁 ESP32 Air Drums")
@@ -34,8 +107,22 @@ class MidiUI:
         self.root.bind('<F11>', self._toggle_fullscreen)
         self.root.bind('<Escape>', self._exit_fullscreen)
 
-        # Track animation states
-        self.drum_animations: Dict[str, int] = {}
+        # Track animation states: one slot per drum id, all advanced
+        # together by the _tick timer
+        self.drum_animations: List[Optional[_AnimState]] = [None] * NUM_DRUMS
+        self._active: List[_AnimState] = []
+        # Notes queued by show_note (any thread), drained by _tick on the Tk thread
+        self._pending: List[Tuple[int, int]] = []
+        self._pending_lock = threading.Lock()
+        # Last style pushed to each animated canvas item, to skip no-op itemconfigs
+        self._last_style: Dict[int, tuple] = {}
+        
+        # Base fill color per drum id, as hex and RGB
+        base_color = [""] * NUM_DRUMS
+        for drum, _, color, *_ in self._DRUM_LAYOUT:
+            base_color[drum] = color
+        self.drum_base_color = tuple(base_color)
+        self.drum_base_rgb = tuple(self._hex_to_rgb(c) for c in self.drum_base_color)
         
         # Main container
         main_frame = tk.Frame(self.root, bg=self.BG_DARK)
@@ -55,6 +142,7 @@ class MidiUI:
         title_label.pack(side=tk.LEFT)
         
         self.status_var = tk.StringVar(value="Ready | Press F11 for fullscreen")
+        self._last_status = self.status_var.get()
         status_label = tk.Label(
             title_frame,
             textvariable=self.status_var,
@@ -72,9 +160,20 @@ class MidiUI:
         )
         self.canvas.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
         
+        # Bound methods for the per-frame animation path, built once instead of
+        # re-resolved through self.canvas / self.root on every frame
+        self._itemconfig = self.canvas.itemconfig
+        self._coords = self.canvas.coords
+        self._delete = self.canvas.delete
+        self._after = self.root.after
+        
         # Bind resize event to redraw drum kit dynamically
         self.canvas.bind('<Configure>', self._on_resize)
         self.drum_kit_created = False
+        self._last_size = (0, 0)
+        self._resize_job: Optional[str] = None
+        self.note_to_drum: List[Optional[Tuple[int, list]]] = [None] * 128
+        self.drum_ids: List[Optional[list]] = [None] * NUM_DRUMS
 
         # Draw the drum kit (will be drawn on first resize)
         # self._create_drum_kit()
@@ -84,6 +183,7 @@ class MidiUI:
         info_frame.pack(fill=tk.X)
         
         self.info_var = tk.StringVar(value="Waiting for MIDI...")
+        self._last_info = self.info_var.get()
         info_label = tk.Label(
             info_frame,
             textvariable=self.info_var,
@@ -110,6 +210,10 @@ class MidiUI:
         quit_btn.pack(side=tk.RIGHT)
 
         self.root.protocol("WM_DELETE_WINDOW", self._on_quit)
+
+        # Tk may only be touched from this thread, so queued notes are polled
+        # here once per frame rather than pushed in from the UDP thread
+        self.root.after(16, self._tick)
     
     def _toggle_fullscreen(self, event=None) -> None:
         """Toggle fullscreen mode."""
@@ -126,14 +230,42 @@ class MidiUI:
     
     def _on_resize(self, event=None) -> None:
         """Handle window resize - redraw drum kit to fit new size."""
-        # Only redraw if canvas has meaningful size
-        if event and event.width > 100 and event.height > 100:
-            self.canvas.delete('all')
-            self._create_drum_kit()
-            self.drum_kit_created = True
+        # Only redraw if canvas has meaningful size, and only if it actually
+        # changed (<Configure> also fires for restacking, focus, etc.)
+        if not event or event.width <= 100 or event.height <= 100:
+            return
+        size = (event.width, event.height)
+        if size == self._last_size:
+            return
+        self._last_size = size
+        
+        if not self.drum_kit_created:
+            self._redraw_drum_kit()
+            return
+        
+        # Debounce: coalesce a drag-resize storm into one redraw
+        if self._resize_job is not None:
+            self.root.after_cancel(self._resize_job)
+        self._resize_job = self.root.after(50, self._redraw_drum_kit)
+
+    def _redraw_drum_kit(self) -> None:
+        """Lay the kit out at the current size, reusing existing canvas items."""
+        self._resize_job = None
+        # In-flight ripples were placed for the old geometry; end them first and
+        # sweep the whole fx layer
+        for state in self._active:
+            self._step_animation(state, finish=True)
+        self._active.clear()
+        self.canvas.delete(self.FX_TAG)
+        self._create_drum_kit()
+        self.drum_kit_created = True
 
     def _create_drum_kit(self) -> None:
-        """Draw the drum kit layout on canvas - scaled to current window size."""
+        """Draw the drum kit layout on canvas - scaled to current window size.
+
+        Items are created on the first call; later calls move the existing items, so
+        canvas ids (and note_to_drum) stay valid across resizes.
+        """
         # Get actual canvas dimensions
         w = self.canvas.winfo_width()
         h = self.canvas.winfo_height()
@@ -141,65 +273,30 @@ class MidiUI:
         # Scale everything based on current size (baseline: 900x600)
         scale = min(w / 900, h / 600)
         
-        # Cymbals at the top
-        # Crash left
-        self.crash_id = self._draw_cymbal(
-            150 * scale, 100 * scale, 70 * scale, "CRASH\n49", self.DRUM_CYMBAL
-        )
-        # Ride right
-        self.ride_id = self._draw_cymbal(
-            w - 150 * scale, 100 * scale, 70 * scale, "RIDE\n51", self.DRUM_CYMBAL
-        )
-        # Hi-hat top left
-        self.hihat_id = self._draw_cymbal(
-            220 * scale, 200 * scale, 50 * scale, "HI-HAT\n42/46", self.DRUM_HIHAT
-        )
-        
-        # Toms in the middle-top
-        center_x = w / 2
-        self.tom_high_id = self._draw_drum(
-            center_x - 40 * scale, 180 * scale, 60 * scale, "TOM H\n50", self.DRUM_TOM
-        )
-        self.tom_mid_id = self._draw_drum(
-            center_x + 80 * scale, 180 * scale, 70 * scale, "TOM M\n48", self.DRUM_TOM
-        )
-        self.tom_low_id = self._draw_drum(
-            w - 220 * scale, 250 * scale, 80 * scale, "TOM L\n45", self.DRUM_TOM
-        )
-        
-        # Snare center
-        self.snare_id = self._draw_drum(
-            center_x, h * 0.5, 90 * scale, "SNARE\n38", self.DRUM_SNARE
-        )
-        
-        # Kick drum at bottom center (largest)
-        self.kick_id = self._draw_drum(
-            center_x, h * 0.75, 110 * scale, "KICK\n36", self.DRUM_KICK
-        )
+        drum_ids = self.drum_ids
+        for drum, label, color, is_cymbal, (ax, bx), (ay, by), r in self._DRUM_LAYOUT:
+            draw = self._draw_cymbal if is_cymbal else self._draw_drum
+            drum_ids[drum] = draw(
+                ax * w + bx * scale, ay * h + by * scale, r * scale, label, color,
+                ids=drum_ids[drum],
+            )
         
-        # Map MIDI notes to canvas objects
-        self.note_to_drum = {
-            36: ("kick", self.kick_id),
-            35: ("kick", self.kick_id),
-            38: ("snare", self.snare_id),
-            40: ("snare", self.snare_id),
-            42: ("hihat", self.hihat_id),
-            44: ("hihat", self.hihat_id),
-            46: ("hihat", self.hihat_id),
-            49: ("crash", self.crash_id),
-            52: ("crash", self.crash_id),
-            51: ("ride", self.ride_id),
-            53: ("ride", self.ride_id),
-            50: ("tom_high", self.tom_high_id),
-            48: ("tom_mid", self.tom_mid_id),
-            47: ("tom_low", self.tom_low_id),
-            45: ("tom_low", self.tom_low_id),
-            43: ("tom_low", self.tom_low_id),
-            41: ("tom_low", self.tom_low_id),
-        }
+        # Map MIDI notes to canvas objects (list indexed by note number)
+        self.note_to_drum = [None] * 128
+        for note, drum in NOTE_TO_DRUM.items():
+            self.note_to_drum[note] = (drum, drum_ids[drum])
 
-    def _draw_drum(self, x: float, y: float, radius: float, label: str, color: str) -> list:
-        """Draw a drum (circle with label)."""
+    def _draw_drum(
+        self, x: float, y: float, radius: float, label: str, color: str,
+        ids: Optional[list] = None,
+    ) -> list:
+        """Draw a drum (circle with label), or move the existing `ids` into place."""
+        if ids is not None:
+            drum, text = ids
+            self.canvas.coords(drum, x - radius, y - radius, x + radius, y + radius)
+            self.canvas.coords(text, x, y)
+            return ids
+        
         # Main drum circle
         drum = self.canvas.create_oval(
             x - radius, y - radius,
@@ -219,8 +316,21 @@ class MidiUI:
         
         return [drum, text]
 
-    def _draw_cymbal(self, x: float, y: float, radius: float, label: str, color: str) -> list:
-        """Draw a cymbal (ellipse with label)."""
+    def _draw_cymbal(
+        self, x: float, y: float, radius: float, label: str, color: str,
+        ids: Optional[list] = None,
+    ) -> list:
+        """Draw a cymbal (ellipse with label), or move the existing `ids` into place."""
+        if ids is not None:
+            cymbal, text = ids
+            self.canvas.coords(
+                cymbal,
+                x - radius * 1.3, y - radius * 0.4,
+                x + radius * 1.3, y + radius * 0.4,
+            )
+            self.canvas.coords(text, x, y)
+            return ids
+        
         # Cymbal ellipse (wider than tall)
         cymbal = self.canvas.create_oval(
             x - radius * 1.3, y - radius * 0.4,
@@ -241,45 +351,62 @@ class MidiUI:
         return [cymbal, text]
 
     def set_status(self, text: str) -> None:
-        self.status_var.set(f"🔗 {text}")
+        status = f"🔗 {text}"
+        if status != self._last_status:
+            self.status_var.set(status)
+            self._last_status = status
 
     def show_note(self, note: int, velocity: int) -> None:
-        """Animate the drum hit when a MIDI note is received."""
-        drum_info = self.note_to_drum.get(note)
-        if not drum_info:
-            # Unknown note - just update info
-            self.info_var.set(f"Note {note} • vel {velocity}")
-            return
-        
-        drum_name, drum_objects = drum_info
-        
-        # Update info display
-        drum_display = self._note_to_drum_name(note)
-        note_name = self._note_to_name(note)
-        self.info_var.set(f"🥁 {drum_display} • Note {note} ({note_name}) • Velocity {velocity}")
+        """Queue a received MIDI note for display on the next frame; safe from any thread."""
+        with self._pending_lock:
+            self._pending.append((note, velocity))
+
+    def _flush_notes(self, pending: List[Tuple[int, int]]) -> None:
+        """Animate a frame's worth of queued notes, one hit per drum at its loudest velocity."""
+        note_to_drum = self.note_to_drum
+        peak = [-1] * NUM_DRUMS
+        for note, velocity in pending:
+            drum_info = note_to_drum[note] if 0 <= note < 128 else None
+            # Malformed packets can carry data bytes above 127; clamp to the MIDI range
+            velocity = min(velocity, 127)
+            if drum_info is not None and velocity > peak[drum_info[0]]:
+                peak[drum_info[0]] = velocity
+        for drum, velocity in enumerate(peak):
+            if velocity >= 0:
+                self._animate_drum_hit(drum, self.drum_ids[drum], velocity)
         
-        # Animate the drum hit
-        self._animate_drum_hit(drum_name, drum_objects, velocity)
+        # Update info display with the latest note only
+        note, velocity = pending[-1]
+        if 0 <= note < 128 and note_to_drum[note] is not None:
+            drum_display = self._note_to_drum_name(note)
+            note_name = self._note_to_name(note)
+            info = f"🥁 {drum_display} • Note {note} ({note_name}) • Velocity {velocity}"
+        else:
+            # Unknown note - just update info
+            info = f"Note {note} • vel {velocity}"
+        # StringVar writes fire traces and relayout the label; skip repeats
+        if info != self._last_info:
+            self.info_var.set(info)
+            self._last_info = info
 
-    def _animate_drum_hit(self, drum_name: str, drum_objects: list, velocity: int) -> None:
+    def _animate_drum_hit(self, drum: int, drum_objects: list, velocity: int) -> None:
         """Create smooth ripple and glow animation for drum hit."""
-        # Cancel any existing animation for this drum
-        if drum_name in self.drum_animations:
-            self.root.after_cancel(self.drum_animations[drum_name])
+        # Finish any existing animation for this drum (removes its ripples)
+        previous = self.drum_animations[drum]
+        if previous is not None:
+            self.drum_animations[drum] = None
+            self._step_animation(previous, finish=True)
+            self._active.remove(previous)
+        elif len(self._active) >= self.MAX_ANIMATIONS:
+            # Under heavy note density, shed load: no ripples, no per-frame work
+            self._flash_drum(drum, drum_objects[0], velocity)
+            return
         
         drum_obj = drum_objects[0]  # The main shape (oval)
         
         # Get original color
-        if "kick" in drum_name:
-            base_color = self.DRUM_KICK
-        elif "snare" in drum_name:
-            base_color = self.DRUM_SNARE
-        elif "hihat" in drum_name:
-            base_color = self.DRUM_HIHAT
-        elif "tom" in drum_name:
-            base_color = self.DRUM_TOM
-        else:  # cymbal
-            base_color = self.DRUM_CYMBAL
+        base_color = self.drum_base_color[drum]
+        base_rgb = self.drum_base_rgb[drum]
         
         # Get drum center for ripple
         coords = self.canvas.coords(drum_obj)
@@ -287,105 +414,149 @@ class MidiUI:
         cy = (coords[1] + coords[3]) / 2
         radius = (coords[2] - coords[0]) / 2
         
-        # Create expanding ripple circles
-        ripple_ids = []
+        # Create expanding ripple circles on the "fx" layer, with a per-drum tag
+        # so a hit's ripples can be removed in one call
+        fx_tag = f"fx:{drum}"
+        ripples = []
         num_ripples = 2
         for i in range(num_ripples):
             ripple = self.canvas.create_oval(
                 cx - 5, cy - 5, cx + 5, cy + 5,
                 outline=self.DRUM_HIT,
                 width=3,
-                fill=""
+                fill="",
+                tags=(self.FX_TAG, fx_tag),
             )
-            ripple_ids.append(ripple)
+            ripples.append((ripple, i * 0.2))
         
-        # Animation parameters
-        max_radius = radius * 1.8
-        steps = 15
-        step_count = [0]  # Use list to allow modification in nested function
+        vel_norm = velocity / 127.0
+        state = _AnimState(
+            drum, drum_obj, fx_tag, ripples, cx, cy,
+            radius * 1.8, vel_norm, base_color,
+            self._hit_color_table(base_rgb, vel_norm, self.ANIM_STEPS),
+        )
         
-        def animate_step():
-            step_count[0] += 1
-            progress = step_count[0] / steps
-            
-            if step_count[0] > steps:
-                # Clean up ripples
-                for ripple in ripple_ids:
-                    self.canvas.delete(ripple)
-                
-                # Final state - return to base color
-                self.canvas.itemconfig(drum_obj, fill=base_color, width=3)
-                
-                # Clean up animation tracking
-                if drum_name in self.drum_animations:
-                    del self.drum_animations[drum_name]
-                return
-            
-            # Smooth easing (ease-out)
-            ease_progress = 1 - (1 - progress) ** 3
+        # Draw the first frame now, then hand the rest to the shared ticker
+        if self._step_animation(state):
+            self.drum_animations[drum] = state
+            self._active.append(state)
+    
+    def _flash_drum(self, drum: int, drum_obj: int, velocity: int) -> None:
+        """Cheap hit feedback: flash the fill to the hit's peak and restore it 50 ms later."""
+        self._last_style.pop(drum_obj, None)
+        peak = int(min(velocity, 127) / 127.0 * 255)
+        self._itemconfig(drum_obj, fill=self.GRAY_HEX[peak])
+        self._after(50, self._end_flash, drum, drum_obj)
+    
+    def _end_flash(self, drum: int, drum_obj: int) -> None:
+        # If a full animation has started on this drum since, it owns the fill
+        if self.drum_animations[drum] is None:
+            self._itemconfig(drum_obj, fill=self.drum_base_color[drum])
+    
+    def _step_animation(self, state: _AnimState, finish: bool = False) -> bool:
+        """Advance one frame of a hit; returns False once the animation is over."""
+        state.step += 1
+        drum_obj = state.drum_obj
+        # Locals for the lookups repeated per ripple
+        itemconfig = self._itemconfig
+        last_style = self._last_style
+        
+        if finish or state.step > self.ANIM_STEPS:
+            # Clean up ripples
+            self._delete(state.fx_tag)
+            for ripple, _ in state.ripples:
+                last_style.pop(ripple, None)
+            last_style.pop(drum_obj, None)
             
-            # Animate ripples expanding and fading
-            for idx, ripple in enumerate(ripple_ids):
-                ripple_progress = ease_progress + (idx * 0.2)
-                if ripple_progress > 1:
-                    ripple_progress = 1
-                
-                r = 5 + (max_radius * ripple_progress)
-                opacity = int(255 * (1 - ripple_progress))
-                
-                self.canvas.coords(
-                    ripple,
-                    cx - r, cy - r,
-                    cx + r, cy + r
-                )
-                
-                # Fade out ripple
-                if opacity > 0:
-                    ripple_color = f"#{opacity:02x}{opacity:02x}{opacity:02x}"
-                    self.canvas.itemconfig(ripple, outline=ripple_color)
+            # Final state - return to base color
+            itemconfig(drum_obj, fill=state.base_color, width=3)
             
-            # Drum color transition - flash to white then back
-            if progress < 0.3:
-                # Flash phase - brighten to white
-                flash_amount = (progress / 0.3)
-                intensity = int((velocity / 127.0) * 255)
-                
-                # Interpolate from base color to white
-                base_rgb = self._hex_to_rgb(base_color)
-                target_rgb = (intensity, intensity, intensity)
-                
-                r = int(base_rgb[0] + (target_rgb[0] - base_rgb[0]) * flash_amount)
-                g = int(base_rgb[1] + (target_rgb[1] - base_rgb[1]) * flash_amount)
-                b = int(base_rgb[2] + (target_rgb[2] - base_rgb[2]) * flash_amount)
-                
-                current_color = f"#{r:02x}{g:02x}{b:02x}"
-            else:
-                # Fade back phase
-                fade_progress = (progress - 0.3) / 0.7
-                intensity = int((velocity / 127.0) * 255 * (1 - fade_progress))
-                
-                base_rgb = self._hex_to_rgb(base_color)
-                white_rgb = (intensity, intensity, intensity)
-                
-                r = int(white_rgb[0] + (base_rgb[0] - white_rgb[0]) * fade_progress)
-                g = int(white_rgb[1] + (base_rgb[1] - white_rgb[1]) * fade_progress)
-                b = int(white_rgb[2] + (base_rgb[2] - white_rgb[2]) * fade_progress)
-                
-                current_color = f"#{r:02x}{g:02x}{b:02x}"
+            # Clean up animation tracking
+            animations = self.drum_animations
+            if animations[state.drum] is state:
+                animations[state.drum] = None
+            return False
+        
+        # Smooth easing (ease-out)
+        progress = state.step * self._ANIM_STEPS_INV
+        ease_progress = 1 - (1 - progress) ** 3
+        
+        # Animate ripples expanding and fading
+        cx = state.cx
+        cy = state.cy
+        max_radius = state.max_radius
+        gray_hex = self.GRAY_HEX
+        coords = self._coords
+        for ripple, offset in state.ripples:
+            ripple_progress = ease_progress + offset
+            if ripple_progress > 1:
+                ripple_progress = 1
             
-            self.canvas.itemconfig(drum_obj, fill=current_color)
+            r = 5 + (max_radius * ripple_progress)
+            opacity = int(255 * (1 - ripple_progress))
             
-            # Outline pulse
-            outline_width = 3 + int(3 * (velocity / 127.0) * (1 - ease_progress))
-            self.canvas.itemconfig(drum_obj, width=outline_width)
+            coords(
+                ripple,
+                cx - r, cy - r,
+                cx + r, cy + r
+            )
             
-            # Continue animation
-            animation_id = self.root.after(16, animate_step)  # ~60 FPS
-            self.drum_animations[drum_name] = animation_id
+            # Fade out ripple (a fully faded ripple is left as-is until cleanup)
+            if opacity > 0:
+                ripple_color = gray_hex[opacity]
+                if last_style.get(ripple) != ripple_color:
+                    itemconfig(ripple, outline=ripple_color)
+                    last_style[ripple] = ripple_color
+        
+        # Drum color transition - precomputed for this hit
+        current_color = state.color_table[state.step]
         
-        # Start animation
-        animate_step()
+        # Outline pulse
+        outline_width = 3 + int(3 * state.vel_norm * (1 - ease_progress))
+        
+        # One Tcl round-trip for both properties, skipped when nothing changed
+        style = (current_color, outline_width)
+        if last_style.get(drum_obj) != style:
+            itemconfig(drum_obj, fill=current_color, width=outline_width)
+            last_style[drum_obj] = style
+        
+        return True
+    
+    def _tick(self) -> None:
+        """Advance every active animation by one frame, then start queued hits (~60 FPS)."""
+        # Reschedule first: Tk reports a callback's exception and carries on, so one
+        # bad frame must not stop the ticker and leave _pending growing undrained
+        self._after(16, self._tick)
+        try:
+            if self._active:
+                step = self._step_animation
+                self._active = [state for state in self._active if step(state)]
+        finally:
+            if self._pending:  # unlocked peek; the swap below is what must be atomic
+                with self._pending_lock:
+                    pending, self._pending = self._pending, []
+                self._flush_notes(pending)
     
+    @staticmethod
+    def _hit_color_table(base_rgb: tuple, vel_norm: float, steps: int) -> list:
+        """Fill color for each animation step of a hit: flash to white, then fade back."""
+        progress = (np.arange(steps + 1) / steps)[:, None]
+        base = np.asarray(base_rgb, dtype=np.float64)
+        
+        # Flash phase - interpolate from base color to white
+        intensity_peak = int(vel_norm * 255)
+        flash = base + (intensity_peak - base) * (progress / 0.3)
+        
+        # Fade back phase
+        fade_progress = (progress - 0.3) / 0.7
+        intensity = np.trunc(vel_norm * 255 * (1 - fade_progress))
+        fade = intensity + (base - intensity) * fade_progress
+        
+        # (steps+1, 3) uint8 trajectory, rendered as one hex string and sliced per step
+        rgb = np.where(progress < 0.3, flash, fade).astype(np.uint8)
+        digits = rgb.tobytes().hex()
+        return ["#" + digits[i:i + 6] for i in range(0, len(digits), 6)]
+
     def _hex_to_rgb(self, hex_color: str) -> tuple:
         """Convert hex color to RGB tuple."""
         hex_color = hex_color.lstrip('#')